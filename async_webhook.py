@@ -0,0 +1,267 @@
+import asyncio
+import time
+
+import aiohttp
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+GLOBAL_RATE = 50  # requests per second across all routes
+WEBHOOK_RATE = 5 / 2  # requests per second per webhook until headers say otherwise
+
+
+class AsyncTokenBucket:
+    """
+    A token bucket that can also be corrected from Discord's rate-limit headers.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (int): Maximum number of tokens held at once.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.window = 0  # Longest window reported by the headers so far
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = asyncio.Lock()
+
+    def _refill(self, now):
+        elapsed = max(0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """
+        Waits until a token is available and takes it.
+        """
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds):
+        """
+        Stops handing out tokens for the given number of seconds.
+
+        Args:
+            seconds (float): How long to block for.
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.blocked_until
+
+    def update(self, limit, remaining, reset_after):
+        """
+        Syncs the bucket with the X-RateLimit-Limit, -Remaining and -Reset-After headers.
+
+        The limit becomes the capacity. The window length is the longest Reset-After seen,
+        which is what Discord reports right after a window starts, and the refill rate
+        is the limit spread over that window.
+
+        Args:
+            limit (int or None): Requests allowed per window, if reported.
+            remaining (int): Requests left in the current window.
+            reset_after (float): Seconds until the window resets.
+        """
+        if limit:
+            self._refill(time.monotonic())
+            self.capacity = limit
+            self.window = max(self.window, reset_after)
+            if self.window > 0:
+                self.rate = limit / self.window
+        if remaining <= 0:
+            self.block(reset_after)
+        else:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+
+def embed_length(embed):
+    """
+    Counts the characters of an embed dictionary the way Discord does for its 6000 character limit.
+
+    Args:
+        embed (dict): An embed as returned by `discord.Embed.to_dict`.
+
+    Returns:
+        int: The number of characters counted against the limit.
+    """
+    length = len(embed.get("title", "")) + len(embed.get("description", ""))
+    length += len(embed.get("footer", {}).get("text", ""))
+    length += len(embed.get("author", {}).get("name", ""))
+    for field in embed.get("fields", []):
+        length += len(field.get("name", "")) + len(field.get("value", ""))
+    return length
+
+
+def batch_embeds(embeds):
+    """
+    Groups embeds into batches that fit in a single webhook message.
+
+    Args:
+        embeds (list): A list of embed dictionaries.
+
+    Returns:
+        list: A list of lists with at most 10 embeds and 6000 characters each.
+    """
+    batches = []
+    current = []
+    current_length = 0
+    for embed in embeds:
+        length = embed_length(embed)
+        if current and (
+            len(current) == MAX_EMBEDS_PER_MESSAGE
+            or current_length + length > MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(current)
+            current = []
+            current_length = 0
+        current.append(embed)
+        current_length += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+class AsyncWebhookClient:
+    """
+    Posts embeds to Discord webhooks concurrently while respecting rate limits.
+
+    Requests pass through a token bucket per webhook, whose capacity and rate follow the
+    rate-limit headers of every response, and then through a global token bucket. A 429 blocks the
+    global or the webhook's bucket for the `retry_after` Discord reports, in seconds.
+
+    Args:
+        max_concurrency (int, optional): Maximum in-flight requests per webhook. Defaults to 2.
+        max_attempts (int, optional): Attempts per message before giving up. Defaults to 5.
+        timeout (float, optional): Seconds before a request times out. Defaults to 30.
+    """
+
+    def __init__(self, max_concurrency=2, max_attempts=5, timeout=30):
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.global_bucket = AsyncTokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self.webhook_buckets = {}
+        self.semaphores = {}
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def _bucket(self, webhook_url):
+        if webhook_url not in self.webhook_buckets:
+            self.webhook_buckets[webhook_url] = AsyncTokenBucket(WEBHOOK_RATE, 5)
+            self.semaphores[webhook_url] = asyncio.Semaphore(self.max_concurrency)
+        return self.webhook_buckets[webhook_url]
+
+    async def send_message(self, webhook_url, embeds):
+        """
+        Posts one webhook message, retrying on rate limits, server errors, connection errors
+        and timeouts.
+
+        Args:
+            webhook_url (str): The URL of the Discord webhook.
+            embeds (list): At most 10 embed dictionaries.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If the last attempt fails to connect or
+                                                       times out.
+            Exception: If the message is rejected or runs out of attempts.
+        """
+        bucket = self._bucket(webhook_url)
+        async with self.semaphores[webhook_url]:
+            for attempt in range(self.max_attempts):
+                # Wait on the webhook first so a blocked webhook does not hold global tokens
+                await bucket.acquire()
+                await self.global_bucket.acquire()
+                try:
+                    async with self.session.post(webhook_url, json={"embeds": embeds}) as response:
+                        limit = response.headers.get("X-RateLimit-Limit")
+                        remaining = response.headers.get("X-RateLimit-Remaining")
+                        reset_after = response.headers.get("X-RateLimit-Reset-After")
+                        if remaining is not None and reset_after is not None:
+                            bucket.update(
+                                int(limit) if limit else None, int(remaining), float(reset_after)
+                            )
+
+                        if response.status in (200, 204):
+                            return
+                        if response.status == 429:
+                            try:
+                                body = await response.json(content_type=None) or {}
+                            except ValueError:
+                                body = {}
+                            retry_after = float(
+                                body.get("retry_after", response.headers.get("Retry-After", 1))
+                            )
+                            is_global = body.get("global") or response.headers.get(
+                                "X-RateLimit-Global"
+                            ) == "true"
+                            print(f"Rate limited by Discord. Retrying after {retry_after} seconds.")
+                            (self.global_bucket if is_global else bucket).block(retry_after)
+                        elif response.status >= 500:
+                            bucket.block(min(2 ** attempt, 30))
+                        else:
+                            text = await response.text()
+                            raise Exception(f"Failed to send message: {response.status}, {text}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_attempts - 1:
+                        raise
+                    print(f"Error sending message: {e!r}. Retrying.")
+                    bucket.block(min(2 ** attempt, 30))
+
+        raise Exception(f"Failed to send message after {self.max_attempts} attempts")
+
+    async def send_embeds(self, webhook_url, embeds):
+        """
+        Posts embeds to a webhook in batches of up to 10 per message.
+
+        Args:
+            webhook_url (str): The URL of the Discord webhook.
+            embeds (list): A list of embed dictionaries.
+
+        Returns:
+            int: The number of embeds that were sent successfully.
+        """
+        batches = batch_embeds(embeds)
+        results = await asyncio.gather(
+            *(self.send_message(webhook_url, batch) for batch in batches),
+            return_exceptions=True,
+        )
+        sent = 0
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"Failed to send {len(batch)} embeds: {result}")
+            else:
+                sent += len(batch)
+        return sent
+
+
+async def send_embeds(webhook_url, embeds, **client_options):
+    """
+    Opens a client, posts the embeds to a webhook, and closes the client.
+
+    Args:
+        webhook_url (str): The URL of the Discord webhook.
+        embeds (list): A list of embed dictionaries.
+        **client_options: Keyword arguments passed to `AsyncWebhookClient`.
+
+    Returns:
+        int: The number of embeds that were sent successfully.
+    """
+    async with AsyncWebhookClient(**client_options) as client:
+        return await client.send_embeds(webhook_url, embeds)
@@ -1,6 +1,7 @@
 import os
 from github import Github
 from dotenv import load_dotenv
+from github_store import GITHUB_API_URL, GitHubStore
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -10,16 +11,19 @@ REPO_NAME = os.getenv("REPO_NAME")  # Format: "username/repo"
 CSV_FILE_PATH = "./listings.csv"  # Path to the CSV file in the repo
 
 # GitHub instance
-github = Github(GITHUB_TOKEN)
-repo = github.get_repo(REPO_NAME)
+github = Github(GITHUB_TOKEN, base_url=GITHUB_API_URL)
+store = GitHubStore(github, REPO_NAME)
+repo = store.repo
 
 def delete_csv_file():
     try:
-        contents = repo.get_contents(CSV_FILE_PATH)
-        repo.delete_file(contents.path, "Delete job listings file", contents.sha)
-        print(f"Deleted {CSV_FILE_PATH} successfully.")
+        if store.delete(CSV_FILE_PATH, "Delete job listings file"):
+            print(f"Deleted {CSV_FILE_PATH} successfully.")
+        else:
+            print(f"{CSV_FILE_PATH} does not exist.")
     except Exception as e:
         print(f"Error deleting CSV file: {e}")
+    print(store.quota_summary())
 
 if __name__ == "__main__":
     delete_csv_file()
@@ -0,0 +1,189 @@
+import base64
+import os
+
+from github import GithubException, UnknownObjectException
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_QUOTA_RESERVE = int(os.getenv("GITHUB_QUOTA_RESERVE", 500))
+
+
+class GitHubStore:
+    """
+    Reads and writes files in a GitHub repository while budgeting the API quota.
+
+    File contents are cached by path and SHA for the whole run, so repeated reads of the
+    same file (including reads of a file that does not exist) cost a single request.
+    X-RateLimit-Remaining is tracked after every request. Non-critical writes are
+    deferred until `flush`, coalesced by path, and skipped if fewer than `reserve`
+    requests remain in the quota.
+
+    Args:
+        github (Github): The authenticated GitHub instance.
+        repo_name (str): The repository to read and write, as "username/repo".
+        reserve (int, optional): Requests to keep for other jobs sharing the token.
+                                 Defaults to GITHUB_QUOTA_RESERVE.
+    """
+
+    def __init__(self, github, repo_name, reserve=GITHUB_QUOTA_RESERVE):
+        self.reserve = reserve
+        self.cache = {}  # {path: (sha, text) or None if the file does not exist}
+        self.deferred = {}  # {path: (content, message)}
+        self.skipped = []
+        self.requests = 0
+        self.remaining = None
+        self.limit = None
+        self.repo = self._request(github.get_repo, repo_name)
+
+    def _request(self, method, *args):
+        """
+        Makes one API request and reads the quota from the headers of its response.
+
+        The quota is left unchanged if no response came back, since `Github.rate_limiting`
+        would make an uncounted request of its own to fill it in.
+        """
+        self.requests += 1
+        try:
+            result = method(*args)
+        except GithubException as e:
+            self._track(e.headers or {})
+            raise
+        # Writes return a dictionary, whose content is incomplete and would be fetched again
+        response = result["commit"] if isinstance(result, dict) else result
+        self._track(response.raw_headers)
+        return result
+
+    def _track(self, headers):
+        if "x-ratelimit-remaining" in headers and "x-ratelimit-limit" in headers:
+            self.remaining = int(headers["x-ratelimit-remaining"])
+            self.limit = int(headers["x-ratelimit-limit"])
+
+    def budget_low(self):
+        """
+        Checks whether the remaining quota has dropped below the reserve.
+
+        Returns:
+            bool: True if non-critical requests should be avoided.
+        """
+        return self.remaining is not None and self.remaining < self.reserve
+
+    def read(self, path):
+        """
+        Reads a file from the repository, fetching it at most once per run.
+
+        The contents API does not return files over 1 MB inline, so those are fetched as a
+        git blob with a second request.
+
+        Args:
+            path (str): The path of the file in the repository.
+
+        Returns:
+            str or None: The decoded contents of the file, or None if it does not exist.
+        """
+        if path not in self.cache:
+            try:
+                contents = self._request(self.repo.get_contents, path)
+            except UnknownObjectException:
+                contents = None
+            if contents is None:
+                self.cache[path] = None
+            elif contents.encoding == "base64":
+                self.cache[path] = (contents.sha, contents.decoded_content.decode())
+            else:
+                blob = self._request(self.repo.get_git_blob, contents.sha)
+                self.cache[path] = (contents.sha, base64.b64decode(blob.content).decode())
+        entry = self.cache[path]
+        return entry[1] if entry else None
+
+    def write(self, path, content, message, critical=True, create_only=False):
+        """
+        Creates or updates a file in the repository.
+
+        Args:
+            path (str): The path of the file in the repository.
+            content (str): The new contents of the file.
+            message (str): The commit message.
+            critical (bool, optional): If False, the write is deferred until `flush` and may
+                                       be skipped when the quota is low. Defaults to True.
+            create_only (bool, optional): If True, never overwrite an existing file. Defaults
+                                          to False.
+
+        Raises:
+            FileExistsError: If `create_only` is set and the file is known to exist.
+            GithubException: If the write fails, including the 422 GitHub returns when a
+                             `create_only` write finds that the file was created meanwhile.
+        """
+        if not critical:
+            self.deferred[path] = (content, message)
+            return
+
+        exists = self.read(path) is not None
+        if create_only:
+            if exists:
+                raise FileExistsError(f"{path} already exists")
+            self._write(path, content, message)
+            return
+        try:
+            self._write(path, content, message)
+        except GithubException as e:
+            # 409: the file changed since it was cached. 422: it was created after it was
+            # cached as missing. Either way, fetch the current SHA and try once more
+            if e.status not in (409, 422):
+                raise
+            del self.cache[path]
+            self.read(path)
+            self._write(path, content, message)
+
+    def _write(self, path, content, message):
+        entry = self.cache[path]
+        if entry is None:
+            result = self._request(self.repo.create_file, path, message, content)
+        else:
+            result = self._request(self.repo.update_file, path, message, content, entry[0])
+        self.cache[path] = (result["content"].sha, content)
+
+    def delete(self, path, message):
+        """
+        Deletes a file from the repository if it exists.
+
+        Args:
+            path (str): The path of the file in the repository.
+            message (str): The commit message.
+
+        Returns:
+            bool: True if the file was deleted, False if it did not exist.
+        """
+        if self.read(path) is None:
+            return False
+        self._request(self.repo.delete_file, path, message, self.cache[path][0])
+        self.cache[path] = None
+        return True
+
+    def flush(self):
+        """
+        Performs the deferred writes, skipping them if the quota is low.
+        """
+        for path, (content, message) in self.deferred.items():
+            if self.budget_low():
+                print(f"Skipping write to {path}, {self.remaining} GitHub requests remaining")
+                self.skipped.append(path)
+                continue
+            try:
+                self.write(path, content, message)
+            except Exception as e:
+                print(f"Error writing {path}: {e}")
+                self.skipped.append(path)
+        self.deferred = {}
+
+    def quota_summary(self):
+        """
+        Summarizes the GitHub API usage of this run.
+
+        Returns:
+            str: A one-line summary for the run log.
+        """
+        summary = f"GitHub Requests: {self.requests}"
+        if self.remaining is not None:
+            summary += f" | Quota Remaining: {self.remaining}/{self.limit}"
+        if self.skipped:
+            summary += f" | Skipped Writes: {', '.join(self.skipped)}"
+        return summary
@@ -0,0 +1,432 @@
+import argparse
+import csv
+import hashlib
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime
+from urllib.parse import urlparse
+
+CSV_FILE_PATH = "./listings.csv"
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "./listings.db")
+PLAN_PROBE_ROWS = 5000  # Rows counted when deciding which side of a query is selective
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,
+    company TEXT NOT NULL,
+    job_title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    date_posted TEXT NOT NULL,
+    posted_on TEXT,
+    host_rev TEXT,
+    posted_year INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS listings_unique
+    ON listings (company, job_title, link, date_posted);
+-- Each index carries the other filter columns so combined filters never touch the table
+CREATE INDEX IF NOT EXISTS listings_posted_on_host ON listings (posted_on, host_rev);
+CREATE INDEX IF NOT EXISTS listings_host_posted_on ON listings (host_rev, posted_on);
+CREATE INDEX IF NOT EXISTS listings_posted_year ON listings (posted_year, posted_on, host_rev);
+CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+    company, job_title, content='listings', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS listings_ai AFTER INSERT ON listings BEGIN
+    INSERT INTO listings_fts (rowid, company, job_title)
+    VALUES (new.id, new.company, new.job_title);
+END;
+CREATE TRIGGER IF NOT EXISTS listings_ad AFTER DELETE ON listings BEGIN
+    INSERT INTO listings_fts (listings_fts, rowid, company, job_title)
+    VALUES ('delete', old.id, old.company, old.job_title);
+END;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def normalize_date(date_posted):
+    """
+    Normalizes a listing date such as "Jul 31" into a sortable "MM-DD" string.
+
+    The source READMEs only publish month and day. Dates are parsed in a leap year so
+    that "Feb 29" is accepted.
+
+    Args:
+        date_posted (str): The date as it appears in the listings CSV.
+
+    Returns:
+        str or None: The normalized date, or None if it cannot be parsed.
+    """
+    date_posted = date_posted.strip()
+    for fmt in ("%b %d", "%m-%d"):
+        try:
+            return datetime.strptime(f"2000 {date_posted}", f"%Y {fmt}").strftime("%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def infer_year(posted_on, ingested_on):
+    """
+    Infers the year a listing was posted from the date it was ingested.
+
+    A listing ingested in January but posted in December belongs to the previous year.
+
+    Args:
+        posted_on (str or None): The normalized "MM-DD" date posted.
+        ingested_on (datetime): When the listing was ingested.
+
+    Returns:
+        int or None: The year posted, or None if the date posted is unknown.
+    """
+    if posted_on is None:
+        return None
+    if posted_on > ingested_on.strftime("%m-%d"):
+        return ingested_on.year - 1
+    return ingested_on.year
+
+
+def reverse_host(host):
+    """
+    Reverses the labels of a host name so that domain suffix matches become prefix matches.
+
+    Args:
+        host (str): A host name, e.g. "deloitte.wd1.myworkdayjobs.com".
+
+    Returns:
+        str: The reversed host, e.g. "com.myworkdayjobs.wd1.deloitte".
+    """
+    host = host.strip().lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return ".".join(reversed(host.split(".")))
+
+
+def link_host(link):
+    """
+    Extracts the reversed host of a listing link.
+
+    Args:
+        link (str): The listing link, with or without surrounding angle brackets.
+
+    Returns:
+        str or None: The reversed host, or None if the link has no host.
+    """
+    host = urlparse(link.strip("<>")).hostname
+    return reverse_host(host) if host else None
+
+
+def connect(db_path=HISTORY_DB_PATH):
+    """
+    Opens the history index, creating the schema if it does not exist yet.
+
+    Args:
+        db_path (str, optional): Path of the SQLite database. Defaults to HISTORY_DB_PATH.
+
+    Returns:
+        sqlite3.Connection: An open connection to the index.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(conn, key, value):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, str(value)),
+    )
+
+
+def index_listings(conn, listings, ingested_on=None):
+    """
+    Inserts listings into the index, ignoring ones that are already present.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the index.
+        listings (iterable): Tuples of (company, job_title, link, date_posted).
+        ingested_on (datetime, optional): When the listings were found, used to record the
+                                          year they were posted. Defaults to no year, as
+                                          for rows backfilled from the CSV.
+
+    Returns:
+        int: The number of listings that were newly indexed.
+    """
+    def rows():
+        for company, job_title, link, date_posted in (listing[:4] for listing in listings):
+            posted_on = normalize_date(date_posted)
+            posted_year = infer_year(posted_on, ingested_on) if ingested_on else None
+            yield company, job_title, link, date_posted, posted_on, link_host(link), posted_year
+
+    with conn:
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO listings "
+            "(company, job_title, link, date_posted, posted_on, host_rev, posted_year) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows(),
+        )
+    return cursor.rowcount
+
+
+def rows_hash(rows):
+    """
+    Hashes CSV rows so that a changed prefix of the CSV can be detected.
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update("\x1f".join(row[:4]).encode() + b"\n")
+    return digest.hexdigest()
+
+
+def build_index(conn, csv_path=CSV_FILE_PATH):
+    """
+    Brings the index up to date with the listings CSV.
+
+    The CSV is append-only, so only rows past the last ingested row are indexed. The
+    ingested rows are hashed, and if they no longer match the start of the CSV (e.g. after
+    clear_csv.py, even once the CSV has grown back), the index is rebuilt from scratch.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the index.
+        csv_path (str, optional): Path of the listings CSV. Defaults to CSV_FILE_PATH.
+
+    Returns:
+        int: The number of listings that were newly indexed.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip header
+        rows = [row for row in reader if len(row) >= 4]
+
+    ingested = int(get_meta(conn, "csv_rows", 0))
+    indexed_hash = get_meta(conn, "csv_hash", rows_hash([]))
+    if len(rows) < ingested or rows_hash(rows[:ingested]) != indexed_hash:
+        print(f"{csv_path} no longer starts with the indexed rows, rebuilding")
+        with conn:
+            conn.execute("DELETE FROM listings")
+        ingested = 0
+
+    added = index_listings(conn, rows[ingested:])
+    with conn:
+        set_meta(conn, "csv_rows", len(rows))
+        set_meta(conn, "csv_hash", rows_hash(rows))
+    if added:
+        conn.execute("ANALYZE")  # Keeps the planner choosing the selective index
+    return added
+
+
+def fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def count_capped(conn, sql, params, cap=None):
+    """
+    Counts the rows of a query, stopping at `cap` (default PLAN_PROBE_ROWS), to estimate
+    how selective it is.
+    """
+    cap = PLAN_PROBE_ROWS if cap is None else cap
+    return conn.execute(f"SELECT COUNT(*) FROM ({sql} LIMIT {cap})", params).fetchone()[0]
+
+
+def query_listings(
+    conn,
+    search=None,
+    company=None,
+    host=None,
+    since=None,
+    until=None,
+    year=None,
+    after=None,
+    limit=25,
+):
+    """
+    Queries the index, newest listings first.
+
+    When a full-text query is combined with host or date filters, whichever side matches
+    fewer rows drives the query: a rare term is looked up in FTS5 first, a selective filter
+    is resolved through its B-tree index first, and otherwise FTS5 is scanned newest first.
+
+    Args:
+        conn (sqlite3.Connection): An open connection to the index.
+        search (str, optional): A full-text query over company and job title.
+        company (str, optional): A phrase that must appear in the company name.
+        host (str, optional): A domain; matches the host itself and all of its subdomains.
+        since (str, optional): Earliest date posted, e.g. "Aug 01".
+        until (str, optional): Latest date posted, e.g. "Sep 30".
+        year (int, optional): Year posted; only listings indexed by a run carry a year.
+        after (int, optional): Cursor returned by the previous page.
+        limit (int, optional): Maximum number of listings to return. Defaults to 25.
+
+    Returns:
+        list: A list of (id, company, job_title, link, date_posted) tuples.
+    """
+    # [(clause, params, index that can resolve it), ...]; clauses prefix their columns
+    # with {c}, which becomes a unary + to keep SQLite off every index but the chosen one
+    filters = []
+
+    if host:
+        host_rev = reverse_host(host)
+        # "/" sorts right after ".", so [host, host/) holds host and all of its subdomains,
+        # plus siblings such as "host-foo" that sort before "host." and are excluded
+        filters.append((
+            "{c}host_rev >= ? AND {c}host_rev < ? AND NOT ({c}host_rev > ? AND {c}host_rev < ?)",
+            [host_rev, host_rev + "/", host_rev, host_rev + "."],
+            "listings_host_posted_on",
+        ))
+
+    date_clauses = []
+    date_params = []
+    if year is not None:
+        date_clauses.append("{c}posted_year = ?")
+        date_params.append(year)
+    for bound, op in ((since, ">="), (until, "<=")):
+        if bound:
+            normalized = normalize_date(bound)
+            if normalized is None:
+                raise ValueError(f"Unrecognized date: {bound}")
+            date_clauses.append(f"{{c}}posted_on {op} ?")
+            date_params.append(normalized)
+    if date_clauses:
+        index = "listings_posted_year" if year is not None else "listings_posted_on_host"
+        filters.append((" AND ".join(date_clauses), date_params, index))
+
+    # SQLite cannot estimate how many rows a range matches, so count up to
+    # PLAN_PROBE_ROWS through each index and drive the query from the smallest
+    driver = None
+    for clause, clause_params, index in filters:
+        sql = f"SELECT id FROM listings INDEXED BY {index} WHERE {clause.format(c='')}"
+        count = count_capped(conn, sql, clause_params)
+        if driver is None or count < driver[0]:
+            driver = (count, index)
+    selective = driver is not None and driver[0] < PLAN_PROBE_ROWS
+    table = f"listings INDEXED BY {driver[1]}" if selective else "listings"
+    # A unary + also keeps SQLite from walking the primary key to satisfy the ORDER BY
+    order = "+id" if selective else "id"
+
+    clauses = [
+        clause.format(c="" if selective and index == driver[1] else "+")
+        for clause, _, index in filters
+    ]
+    params = [param for _, clause_params, _ in filters for param in clause_params]
+    if after is not None:
+        clauses.append("{id} < ?")
+        params.append(after)
+
+    match = []
+    if search:
+        match.append(f"({search})")
+    if company:
+        match.append(f"company : {fts_phrase(company)}")
+    match = " AND ".join(match)
+
+    columns = "SELECT id, company, job_title, link, date_posted"
+    where = " WHERE " + " AND ".join(clauses).format(id="id") if clauses else ""
+
+    if not match:
+        sql = f"{columns} FROM {table}{where} ORDER BY {order} DESC LIMIT ?"
+        return conn.execute(sql, params + [limit]).fetchall()
+
+    fts_sql = "SELECT rowid FROM listings_fts WHERE listings_fts MATCH ?"
+    if filters and count_capped(conn, fts_sql, [match]) < PLAN_PROBE_ROWS:
+        # Few full-text matches: collect them, then let the filters narrow them down
+        sql = f"{columns} FROM listings{where} AND id IN ({fts_sql}) ORDER BY id DESC LIMIT ?"
+        return conn.execute(sql, params + [match, limit]).fetchall()
+
+    if selective:
+        # Few filtered rows: walk them newest first and check each batch against FTS5
+        candidates = [
+            row[0]
+            for row in conn.execute(f"SELECT id FROM {table}{where} ORDER BY +id DESC", params)
+        ]
+        ids = []
+        for start in range(0, len(candidates), limit * 2):
+            batch = candidates[start:start + limit * 2]
+            placeholders = ",".join("?" * len(batch))
+            matched = {
+                row[0]
+                for row in conn.execute(f"{fts_sql} AND rowid IN ({placeholders})", [match] + batch)
+            }
+            ids += [id for id in batch if id in matched]
+            if len(ids) >= limit:
+                break
+        ids = ids[:limit]
+        placeholders = ",".join("?" * len(ids))
+        sql = f"{columns} FROM listings WHERE id IN ({placeholders}) ORDER BY id DESC"
+        return conn.execute(sql, ids).fetchall()
+
+    # Let FTS5 drive the scan so matches come back in rowid order without a sort
+    sql = (
+        "SELECT listings.id, listings.company, listings.job_title, link, date_posted "
+        "FROM listings_fts JOIN listings ON listings.id = listings_fts.rowid "
+        "WHERE listings_fts MATCH ?"
+    )
+    for clause in clauses:
+        sql += " AND " + clause.format(id="listings_fts.rowid")
+    sql += " ORDER BY listings_fts.rowid DESC LIMIT ?"
+    return conn.execute(sql, [match] + params + [limit]).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the history of posted job listings.")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="path of the SQLite index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="index new rows from the listings CSV")
+    build_parser.add_argument("--csv", default=CSV_FILE_PATH, help="path of the listings CSV")
+
+    query_parser = subparsers.add_parser("query", help="search indexed listings")
+    query_parser.add_argument("search", nargs="?", help="full-text query over company and title")
+    query_parser.add_argument("--company", help="phrase to match in the company name")
+    query_parser.add_argument("--host", help="link domain, e.g. myworkdayjobs.com")
+    query_parser.add_argument("--since", help="earliest date posted, e.g. 'Aug 01'")
+    query_parser.add_argument("--until", help="latest date posted, e.g. 'Sep 30'")
+    query_parser.add_argument("--year", type=int, help="year posted, for listings indexed by a run")
+    query_parser.add_argument("--after", type=int, help="cursor printed by the previous page")
+    query_parser.add_argument("--limit", type=int, default=25, help="listings per page")
+
+    args = parser.parse_args(argv)
+    with closing(connect(args.db)) as conn:
+        run_command(parser, args, conn)
+
+
+def run_command(parser, args, conn):
+    if args.command == "build":
+        added = build_index(conn, args.csv)
+        total = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+        print(f"Indexed {added} new listings ({total} total)")
+        return
+
+    try:
+        rows = query_listings(
+            conn,
+            search=args.search,
+            company=args.company,
+            host=args.host,
+            since=args.since,
+            until=args.until,
+            year=args.year,
+            after=args.after,
+            limit=args.limit,
+        )
+    except (ValueError, sqlite3.OperationalError) as e:
+        parser.error(str(e))
+
+    writer = csv.writer(sys.stdout)
+    for row in rows:
+        writer.writerow(row[1:])
+    if len(rows) == args.limit:
+        print(f"Next page: --after {rows[-1][0]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 import os
 import json
+import asyncio
 import git
 from datetime import datetime, timedelta, timezone
-import requests
 import discord
 from dotenv import load_dotenv
+from async_webhook import send_embeds
 
 load_dotenv()
 REPO_URL = 'https://github.com/Ouckah/Summer2025-Internships'
@@ -33,23 +34,10 @@ def read_json():
         data = json.load(file)
     return data
 
-# Function to send a message to Discord using embeds
-def send_discord_embed(embed):
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "embeds": [embed.to_dict()]
-    }
-    response = requests.post(DISCORD_WEBHOOK_URL, json=data, headers=headers)
-
-    if response.status_code == 204:
-        print("Message sent successfully.")
-    elif response.status_code == 429:  # Rate limited
-        retry_after = int(response.headers.get('Retry-After', 0)) / 1000  # Convert ms to seconds
-        print(f"Rate limited by Discord. Retrying after {retry_after} seconds.")
-        time.sleep(retry_after)
-        send_discord_embed(embed)  # Retry after the specified time
-    else:
-        print(f"Failed to send message. Status code: {response.status_code}, response: {response.text}")
+# Function to send many embeds concurrently, batched up to 10 per message
+def send_discord_embeds(embeds):
+    sent = asyncio.run(send_embeds(DISCORD_WEBHOOK_URL, [embed.to_dict() for embed in embeds]))
+    print(f"Sent {sent} of {len(embeds)} embeds.")
 
 # Function to format the message using an embed
 def format_embed_message(role):
@@ -95,13 +83,14 @@ def check_for_new_roles():
         temp_role = old_roles[len(old_roles)-i-1]
         print(temp_role['company_name'], datetime.fromtimestamp(temp_role['date_posted'], timezone.utc))
 
-    # if new_roles:
-    #     print(f"Found {len(new_roles)} new roles.")
-    #     # Send Discord messages for new roles
-    #     for role in new_roles:
-    #         if role['is_visible'] and role['active']:
-    #             embed = format_embed_message(role)
-    #             send_discord_embed(embed)
+    if new_roles:
+        print(f"Found {len(new_roles)} new roles.")
+        # Send Discord messages for new roles
+        embeds = [
+            format_embed_message(role) for role in new_roles
+            if role['is_visible'] and role['active']
+        ]
+        send_discord_embeds(embeds)
     else:
         print("No new roles found.")
 
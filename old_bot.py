@@ -8,6 +8,11 @@ import json
 from github import Github
 import sys
 import time
+from contextlib import closing
+import history
+from readme_parser import parse_readme, parse_readme_parallel
+from scheduler import POLL_STATE_PATH, PollScheduler
+from github_store import GITHUB_API_URL, GitHubStore
 
 load_dotenv()  #
 PRIMARY_REPO = os.getenv("JOB_REPO_URL")
@@ -17,107 +22,24 @@ LOGS_WEBHOOK_URL = os.getenv("LOGS_WEBHOOK_URL")
 GITHUB_TOKEN = os.getenv("TOKEN_GITHUB")
 REPO_NAME = os.getenv("REPO_NAME")  # Format: "username/repo"
 CSV_FILE_PATH = "./listings.csv"
+POLL_STATE_REPO_PATH = "./poll_state.json"
 
-github = Github(GITHUB_TOKEN)
-repo = github.get_repo(REPO_NAME)
-
-log_file = open("logs.txt", "w")
-sys.stdout = log_file
+# Set up by connect_github() rather than at import, because parse_readme_parallel's worker
+# processes re-import this module under the spawn and forkserver start methods
+github = None
+repo = None
+store = None
 result_message = "" 
 
 
-def process_match_groups(company, job_title, link_html, last_company):
-    """
-    Formats the match groups from a company, job title, and link HTML.
-
-    Args:
-        company (str): The company name.
-        job_title (str): The job title.
-        link_html (str): The HTML containing the link.
-        last_company (str): The last company name.
-
-    Returns:
-        tuple: A tuple containing the processed company name, job title, and link.
+def connect_github():
     """
-    company_pattern = re.compile(r"\*\*\[([^\]]+)\]")
-    company_pattern_match = company_pattern.search(company)
-    if company_pattern_match:
-        company = company_pattern_match.group(1)
-    if "↳" in company:  # this has to be after the first company assignment
-        company = last_company
-    company = company.replace(",", "")
-    job_title = job_title.replace(",", "").replace("🛂", "")
-    link_match = re.search(r'href="([^"]+)"', link_html)
-    link = f"<{link_match.group(1)}>" if link_match else "No link found"
-
-    return company, job_title, link
-
-
-def parse_readme(content):
+    Connects to the GitHub repository that stores the listings CSV.
     """
-    Parses a README file and extracts job listings from it.
-
-    Args:
-        content (str): The content of the README file.
-
-    Returns:
-        dict: A dictionary containing the extracted job listings. The dictionary
-              has the following structure:
-              {
-                  "Company": {
-                      "Job Title": {
-                          "link": str,
-                          "date_posted": str,
-                          "formatted_listing": str
-                      },
-#     Args:
-#         message (str): The content of the message to be sent.
-#         target_url (str, optional): The URL of the Discord webhook. Defaults to LISTINGS_WEBHOOK_URL.
-
-#     Raises:
-#         Exception: If the message fails to send, an exception is raised with the status code and response text.
-#     """
-#     data = {"content": message}
-#     headers = {"Content-Type": "application/json"}
-#     response = requests.post(target_url, json=data, headers=headers)
-#     if response.status_code != 204:
-#         raise Exception(
-#             f"Failed to send message: {response.status_code}, {response.text}"
-#         )
-    )  # {Company: {Job Title: {link, date_posted, formatted_listing}, ...}, ...}
-    listing_pattern = re.compile(
-        r'\| ([^|]+) \| ([^|]+) \| [^|]+ \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
-    )
-    arrow_listing_pattern = re.compile(
-        r'\| ↳ \| ([^|]+) \| ([^|]+) \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
-    )
-
-    lines = content.split("\n")
-    last_company = ""
-    for line in lines:
-        normal_match = listing_pattern.match(line)
-        arrow_match = arrow_listing_pattern.match(line)
-        match = normal_match if normal_match else arrow_match
-
-        if match:
-            company, job_title, link_html, date_posted = match.groups()
-            company, job_title, link = process_match_groups(
-                company, job_title, link_html, last_company
-            )
-            formatted_listing = f"**{company}** - {job_title}\nApply: {link}\nDate Posted: {date_posted}"
-
-            if company not in listings:
-                listings[company] = {}
-
-            listings[company][job_title] = {
-                "link": link,
-                "date_posted": date_posted,
-                "formatted_listing": formatted_listing,
-            }
-            if "↳" not in company:
-                last_company = company
-
-    return listings
+    global github, repo, store
+    github = Github(GITHUB_TOKEN, base_url=GITHUB_API_URL)
+    store = GitHubStore(github, REPO_NAME)
+    repo = store.repo
 
 
 def fetch_github_listings(url):
@@ -240,14 +162,15 @@ def create_csv():
 
     This function creates a CSV file with the specified header and initializes it with empty data.
     The header is a list containing the column names for the CSV file.
-    The CSV file is created in the specified `CSV_FILE_PATH` using the `repo.create_file` method.
-    If the file creation is successful, a success message is printed.
+    The CSV file is created in the specified `CSV_FILE_PATH` using the `store.write` method,
+    which never overwrites an existing file here. If the file creation is successful, a success
+    message is printed.
     If an exception occurs during file creation, an error message is printed with the exception details.
     """
     header = ["company", "job_title", "link", "date_posted"]
     csv_content = ",".join(header) + "\n"
     try:
-        repo.create_file(CSV_FILE_PATH, "Create job listings file", csv_content)
+        store.write(CSV_FILE_PATH, csv_content, "Create job listings file", create_only=True)
         print(f"Created {CSV_FILE_PATH} successfully.")
     except Exception as e:
         print(f"Error creating CSV file: {e}")
@@ -258,38 +181,30 @@ def read_csv():
     Reads a CSV file and returns a set of unique rows.
 
     This function reads a CSV file specified by `CSV_FILE_PATH` and returns a set of unique rows. 
-    The function first attempts to read the file and parse its contents. If an exception occurs, 
-    indicating that the file does not exist or cannot be read, the function attempts to create 
-    the file by calling the `create_csv` function. If the file creation is successful, the function 
-    reads the newly created file and adds its rows to the set. If an exception occurs during the 
-    file creation or reading, an error message is printed with the exception details. Finally, the 
-    function prints the number of unique rows in the CSV file and returns the set of unique rows.
+    The file is read through `store`, so later reads in the same run do not cost another request. 
+    If the file does not exist, the function creates it by calling the `create_csv` function, 
+    starting from an empty set. Finally, the function prints the number of unique rows in the 
+    CSV file and returns the set of unique rows.
 
     Returns:
         set: A set of unique rows from the CSV file.
+
+    Raises:
+        GithubException: If the file exists but cannot be read. The run must stop here, since
+                         starting from an empty set would re-send every listing.
     """
     listings = set()
     c = 0
-    try:
-        contents = repo.get_contents(CSV_FILE_PATH)
-        decoded_content = contents.decoded_content.decode()
+    decoded_content = store.read(CSV_FILE_PATH)
+    if decoded_content is None:
+        print(f"{CSV_FILE_PATH} does not exist")
+        create_csv()
+    else:
         reader = csv.reader(decoded_content.splitlines())
-        next(reader)  # Skip header
+        next(reader, None)  # Skip header
         for row in reader:
             listings.add(tuple(row))
             c += 1
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
-        create_csv()  # Create the file if it does not exist
-        try:
-            contents = repo.get_contents(CSV_FILE_PATH)
-            decoded_content = contents.decoded_content.decode()
-            reader = csv.reader(decoded_content.splitlines())
-            next(reader)  # Skip header
-            for row in reader:
-                listings.add(tuple(row))
-        except Exception as e:
-            print(f"Error reading newly created CSV file: {e}")
     print(f"CSV began with {c} unique rows")
     return listings
 
@@ -324,23 +239,20 @@ def append_to_csv(new_listings):
     if not new_listings:
         return
 
-    try:
-        contents = repo.get_contents(CSV_FILE_PATH)
-        csv_content = contents.decoded_content.decode()
+    csv_content = store.read(CSV_FILE_PATH)  # Cached by read_csv, so no extra request
+    if csv_content is not None:
         new_csv_content = csv_content.strip() + "\n"
         for listing in new_listings:
             new_csv_content += ",".join(listing[:4]) + "\n"
-        repo.update_file(
-            contents.path, "Append new job listings", new_csv_content, contents.sha
-        )
+        store.write(CSV_FILE_PATH, new_csv_content, "Append new job listings")
 
-    except Exception:
+    else:
         # Create the file if it doesn't exist
         header = ["company", "job_title", "link", "date_posted"]
         csv_content = ",".join(header) + "\n"
         for listing in new_listings:
             csv_content += ",".join(listing[:4]) + "\n"
-        repo.create_file(CSV_FILE_PATH, "Create job listings file", csv_content)
+        store.write(CSV_FILE_PATH, csv_content, "Create job listings file")
 
 
 def print_dict(dict_obj):
@@ -366,41 +278,7 @@ def process_listings(url):
     response = requests.get(url)
     response.raise_for_status()
     content = response.text
-    listings = (
-        {}
-    )  # {Company: {Job Title: {link, date_posted, formatted_listing}, ...}, ...}
-    listing_pattern = re.compile(
-        r'\| ([^|]+) \| ([^|]+) \| [^|]+ \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
-    )
-    arrow_listing_pattern = re.compile(
-        r'\| ↳ \| ([^|]+) \| ([^|]+) \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
-    )
-
-    lines = content.split("\n")
-    last_company = ""
-    for line in lines:
-        normal_match = listing_pattern.match(line)
-        arrow_match = arrow_listing_pattern.match(line)
-        match = normal_match if normal_match else arrow_match
-
-        if match:
-            company, job_title, link_html, date_posted = match.groups()
-            company, job_title, link = process_match_groups(
-                company, job_title, link_html, last_company
-            )
-            formatted_listing = f"**{company}** - {job_title}\nApply: {link}\nDate Posted: {date_posted}"
-
-            if company not in listings:
-                listings[company] = {}
-
-            listings[company][job_title] = {
-                "link": link,
-                "date_posted": date_posted,
-                "formatted_listing": formatted_listing,
-            }
-            if "↳" not in company:
-                last_company = company
-
+    listings = parse_readme_parallel(content)
     return listings
 
 
@@ -428,7 +306,7 @@ def remove_utm_source(url):
     return url
 
 
-def remove_duplicates(current, primary, secondary):
+def remove_duplicates(current, primary, secondary, known_secondary=None):
     """
     Removes duplicate job listings from the primary and secondary job listings and avoids duplicating current job listings.
 
@@ -436,12 +314,18 @@ def remove_duplicates(current, primary, secondary):
         current (set): A set of tuples representing the current job listings.
         primary (dict): A dictionary containing the primary job listings, where the keys are company names and the values are dictionaries with job titles as keys and job details as values.
         secondary (dict): A dictionary containing the secondary job listings, where the keys are company names and the values are dictionaries with job titles as keys and job details as values.
+        known_secondary (dict, optional): Secondary listings to filter primary duplicates against, with at least a "link" for each job. Used when the secondary source was skipped on this run. Defaults to `secondary`.
 
     Returns:
-        list: A (ideally) unique list of formatted job listings.
+        tuple: A (ideally) unique list of formatted job listings, and a dictionary with the
+               number of new listings from the "primary" and "secondary" sources that can be
+               saved to the CSV.
     """
     new_listings = []  # stores the formatted listings
+    saved = {"primary": 0, "secondary": 0}  # excludes listings extract_listing_details rejects
     dupe = 0
+    if known_secondary is None:
+        known_secondary = secondary
     # Process Secondary Listings
     pt = 0
     pa = 0
@@ -460,6 +344,8 @@ def remove_duplicates(current, primary, secondary):
                 new_listings.append(details["formatted_listing"])
                 current.add(current_listing)
                 sa += 1
+                if extract_listing_details(details["formatted_listing"]):
+                    saved["secondary"] += 1
 
     # Process Primary Listings
     for company, jobs in primary.items():
@@ -470,7 +356,7 @@ def remove_duplicates(current, primary, secondary):
             jobs.items()
         ):  # Process the current primary listing, check if it is a duplicate
             pt += 1
-            seconday_company_dict = secondary.get(company)
+            seconday_company_dict = known_secondary.get(company)
             in_secondary = False
             if (
                 seconday_company_dict
@@ -508,9 +394,11 @@ def remove_duplicates(current, primary, secondary):
                 current.add(current_listing)
                 pa += 1
                 new_listings.append(details["formatted_listing"])
+                if extract_listing_details(details["formatted_listing"]):
+                    saved["primary"] += 1
     result_message = f"Total Primary Listings: {pt} | Total Secondary Listings: {st} | Total Listings: {pt+st}\nNew Primary Listings: {pa} | New Secondary Listings: {sa} | Total New Listings: {pa+sa}"
     print(result_message)
-    return new_listings
+    return new_listings, saved
 
 
 def extract_listing_details(listing_str):
@@ -604,14 +492,48 @@ def create_and_send_discord_message(new_listings):
     send_discord_alert(new_listings_message, LOGS_WEBHOOK_URL)
 
 
+def poll_source(scheduler, url):
+    """
+    Fetches the listings from a source if the scheduler says it is due.
+
+    Args:
+        scheduler (PollScheduler): The per-source poll schedule.
+        url (str): The URL of the source README.
+
+    Returns:
+        tuple: The listings from the source, and whether they were fetched on this run. A source
+               that is not due returns no listings.
+    """
+    if not scheduler.is_due(url):
+        print(f"Skipping {url}, not due yet")
+        return {}, False
+    return process_listings(url), True
+
+
 def main():
+    connect_github()
     current_listings = read_csv()
-    secondary_listings = process_listings(SECONDARY_REPO)
-    primary_listings = process_listings(PRIMARY_REPO)
-
-    new_listings = remove_duplicates(
-        current_listings, primary_listings, secondary_listings
+    if not os.path.exists(POLL_STATE_PATH):  # Restore the schedule saved by the last run
+        poll_state = store.read(POLL_STATE_REPO_PATH)
+        if poll_state:
+            with open(POLL_STATE_PATH, "w") as file:
+                file.write(poll_state)
+    scheduler = PollScheduler()
+    secondary_listings, secondary_polled = poll_source(scheduler, SECONDARY_REPO)
+    primary_listings, primary_polled = poll_source(scheduler, PRIMARY_REPO)
+
+    # A skipped secondary source still filters primary copies of the listings it last had
+    known_secondary = None if secondary_polled else scheduler.last_listings(SECONDARY_REPO)
+    new_listings, new_counts = remove_duplicates(
+        current_listings, primary_listings, secondary_listings, known_secondary
     )
+    for url, listings, polled, hits in (
+        (SECONDARY_REPO, secondary_listings, secondary_polled, new_counts["secondary"]),
+        (PRIMARY_REPO, primary_listings, primary_polled, new_counts["primary"]),
+    ):
+        if polled:
+            interval = scheduler.record_poll(url, listings, hits)
+            print(f"Polled {url}: {hits} new listings, next poll in {interval}s")
 
     if len(new_listings) > 0:
         create_and_send_discord_message(new_listings)
@@ -621,10 +543,23 @@ def main():
             if listing_tuple:
                 new_listing_tuples.append(listing_tuple)
         append_to_csv(new_listing_tuples)
+        try:
+            with closing(history.connect()) as conn:
+                history.index_listings(conn, new_listing_tuples, ingested_on=datetime.now())
+        except Exception as e:
+            print(f"Error indexing new listings: {e}")
         if len(result_message) > 0:
             send_discord_alert(result_message, LOGS_WEBHOOK_URL)
+    scheduler.save()
+    if scheduler.schedule_changed():  # Runs that poll nothing leave the schedule alone, so skip the commit
+        with open(POLL_STATE_PATH, "r") as file:
+            store.write(POLL_STATE_REPO_PATH, file.read(), "Update poll schedule", critical=False)
+    store.flush()
+    print(store.quota_summary())
 
 
 if __name__ == "__main__":
+    log_file = open("logs.txt", "w")
+    sys.stdout = log_file
     main()
-    log_file.close
+    log_file.close()
@@ -0,0 +1,234 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PARALLEL_PARSE_MIN_LINES = int(os.getenv("PARALLEL_PARSE_MIN_LINES", 50000))
+
+COMPANY_PATTERN = re.compile(r"\*\*\[([^\]]+)\]")
+LINK_PATTERN = re.compile(r'href="([^"]+)"')
+LISTING_PATTERN = re.compile(
+    r'\| ([^|]+) \| ([^|]+) \| [^|]+ \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
+)
+ARROW_LISTING_PATTERN = re.compile(
+    r'\| ↳ \| ([^|]+) \| ([^|]+) \| (<a href="[^"]+"><img src="[^"]+" width="\d+" alt="Apply"></a>.*?) \| (\w+ \d{2}) \|'
+)
+
+
+def process_match_groups(company, job_title, link_html, last_company):
+    """
+    Formats the match groups from a company, job title, and link HTML.
+
+    Args:
+        company (str): The company name.
+        job_title (str): The job title.
+        link_html (str): The HTML containing the link.
+        last_company (str): The last company name.
+
+    Returns:
+        tuple: A tuple containing the processed company name, job title, and link.
+    """
+    company_pattern_match = COMPANY_PATTERN.search(company)
+    if company_pattern_match:
+        company = company_pattern_match.group(1)
+    if "↳" in company:  # this has to be after the first company assignment
+        company = last_company
+    company = company.replace(",", "")
+    job_title = job_title.replace(",", "").replace("🛂", "")
+    link_match = LINK_PATTERN.search(link_html)
+    link = f"<{link_match.group(1)}>" if link_match else "No link found"
+
+    return company, job_title, link
+
+
+def iter_listing_rows(lines):
+    """
+    Extracts job listings from lines of a README table.
+
+    Args:
+        lines (iterable): The lines to parse.
+
+    Yields:
+        tuple: A (company, job_title, link, date_posted) tuple for each listing row.
+    """
+    last_company = ""
+    for line in lines:
+        normal_match = LISTING_PATTERN.match(line)
+        arrow_match = ARROW_LISTING_PATTERN.match(line)
+        match = normal_match if normal_match else arrow_match
+
+        if match:
+            company, job_title, link_html, date_posted = match.groups()
+            company, job_title, link = process_match_groups(
+                company, job_title, link_html, last_company
+            )
+            yield company, job_title, link, date_posted
+            if "↳" not in company:
+                last_company = company
+
+
+def build_listings(rows):
+    """
+    Groups listing rows by company, as described in `parse_readme`.
+
+    Args:
+        rows (iterable): (company, job_title, link, date_posted) tuples in README order.
+
+    Returns:
+        dict: A dictionary of job listings.
+    """
+    listings = {}  # {Company: {Job Title: {link, date_posted, formatted_listing}, ...}, ...}
+    for company, job_title, link, date_posted in rows:
+        formatted_listing = f"**{company}** - {job_title}\nApply: {link}\nDate Posted: {date_posted}"
+
+        if company not in listings:
+            listings[company] = {}
+
+        listings[company][job_title] = {
+            "link": link,
+            "date_posted": date_posted,
+            "formatted_listing": formatted_listing,
+        }
+
+    return listings
+
+
+def parse_chunk(chunk):
+    """
+    Parses a chunk of a README in a worker process.
+
+    The chunk is sent as one string and the rows come back as flat tuples, which keeps
+    the cost of pickling between processes well below the cost of the parse.
+    """
+    return list(iter_listing_rows(chunk.split("\n")))
+
+
+def parse_readme(content):
+    """
+    Parses a README file and extracts job listings from it.
+
+    Args:
+        content (str): The content of the README file.
+
+    Returns:
+        dict: A dictionary containing the extracted job listings. The dictionary
+              has the following structure:
+              {
+                  "Company": {
+                      "Job Title": {
+                          "link": str,
+                          "date_posted": str,
+                          "formatted_listing": str
+                      },
+                      ...
+                  },
+                  ...
+              }
+    """
+    return build_listings(iter_listing_rows(content.split("\n")))
+
+
+def is_company_row(line):
+    """
+    Checks whether a line is a listing row that names its company instead of using ↳.
+
+    Parsing can safely start at such a row, because it sets the last company itself.
+    """
+    if not line.startswith("| ") or line.startswith("| ↳"):
+        return False
+    match = LISTING_PATTERN.match(line)
+    return bool(match) and "↳" not in match.group(1)
+
+
+def split_at_company_rows(lines, chunks):
+    """
+    Splits lines into roughly equal chunks that each start at a company row.
+
+    Args:
+        lines (list): The lines of a README.
+        chunks (int): The number of chunks to aim for.
+
+    Returns:
+        list: A list of (start, end) line ranges covering all of the lines in order.
+    """
+    bounds = [0]
+    for i in range(1, chunks):
+        start = max(bounds[-1] + 1, len(lines) * i // chunks)
+        while start < len(lines) and not is_company_row(lines[start]):
+            start += 1
+        if start >= len(lines):
+            break
+        bounds.append(start)
+    bounds.append(len(lines))
+    return list(zip(bounds, bounds[1:]))
+
+
+def parse_readme_parallel(content, executor=None, max_workers=None):
+    """
+    Parses a README like `parse_readme`, splitting large ones across worker processes.
+
+    READMEs with fewer than PARALLEL_PARSE_MIN_LINES lines are parsed serially, since
+    starting workers and sending them the text costs more than the parse itself.
+
+    Under the spawn and forkserver start methods each worker re-imports the calling
+    script's main module, so that module must not do any work at import time.
+
+    Args:
+        content (str): The content of the README file.
+        executor (ProcessPoolExecutor, optional): A pool to reuse across READMEs.
+                                                  Defaults to a pool created for this call.
+        max_workers (int, optional): The number of workers to split the README across.
+                                     Defaults to the number of CPUs.
+
+    Returns:
+        dict: The same dictionary of job listings that `parse_readme` returns.
+    """
+    lines = content.split("\n")
+    if len(lines) < PARALLEL_PARSE_MIN_LINES:
+        return build_listings(iter_listing_rows(lines))
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return parse_readme_parallel(content, executor, max_workers)
+
+    ranges = split_at_company_rows(lines, (max_workers or os.cpu_count() or 1) * 4)
+    chunks = ("\n".join(lines[start:end]) for start, end in ranges)
+    # map() yields results in submission order, so rows are grouped in README order
+    rows = (row for part in executor.map(parse_chunk, chunks) for row in part)
+    return build_listings(rows)
+
+
+def generate_readme(rows):
+    """
+    Generates a synthetic README table for benchmarking, with ↳ rows under each company.
+    """
+    lines = [
+        "| Company | Role | Location | Application/Link | Date Posted |",
+        "| ------- | ---- | -------- | ---------------- | ----------- |",
+    ]
+    for i in range(rows):
+        company = f"**[Company {i // 4}](https://example.com/{i // 4})**" if i % 4 == 0 else "↳"
+        lines.append(
+            f'| {company} | Software Engineer Intern {i} | Remote | '
+            f'<a href="https://example.com/apply/{i}?utm_source=Simplify&ref=Simplify">'
+            f'<img src="https://i.imgur.com/u1KNU8z.png" width="118" alt="Apply"></a> | Sep {i % 28 + 1:02d} |'
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    readme = generate_readme(100000)
+
+    start = time.perf_counter()
+    serial = parse_readme(readme)
+    serial_time = time.perf_counter() - start
+    print(f"serial: {serial_time:.2f}s")
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parse_readme_parallel(readme, executor, workers)  # Start the workers
+            start = time.perf_counter()
+            parallel = parse_readme_parallel(readme, executor, workers)
+            parallel_time = time.perf_counter() - start
+        assert list(parallel.items()) == list(serial.items())
+        print(f"{workers} workers: {parallel_time:.2f}s ({serial_time / parallel_time:.2f}x)")
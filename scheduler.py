@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import time
+
+POLL_STATE_PATH = os.getenv("POLL_STATE_PATH", "./poll_state.json")
+POLL_MIN_INTERVAL = int(os.getenv("POLL_MIN_INTERVAL", 300))  # seconds
+POLL_MAX_INTERVAL = int(os.getenv("POLL_MAX_INTERVAL", 6 * 60 * 60))  # seconds
+HISTORY_LENGTH = 50
+
+
+def content_hash(listings):
+    """
+    Hashes parsed listings so that changes in upstream content can be detected.
+
+    Args:
+        listings (dict): Listings as returned by `process_listings`.
+
+    Returns:
+        str: A hex digest that only changes when the listings change.
+    """
+    encoded = json.dumps(listings, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def compact_listings(listings):
+    """
+    Keeps only the link of each listing, which is all `remove_duplicates` needs to filter
+    primary copies of secondary listings.
+
+    Args:
+        listings (dict): Listings as returned by `process_listings`.
+
+    Returns:
+        dict: A dictionary of the form {Company: {Job Title: {"link": str}}}.
+    """
+    return {
+        company: {job_title: {"link": details["link"]} for job_title, details in jobs.items()}
+        for company, jobs in listings.items()
+    }
+
+
+class PollScheduler:
+    """
+    Adapts how often each source is polled based on how often it has changed.
+
+    Every poll is recorded as (timestamp, changed, hits) in the source's history, and the
+    links it fetched are kept so that a skipped source can still be compared against. A poll
+    that finds new listings or a new content hash resets the source to the minimum
+    interval; each consecutive quiet poll doubles the interval up to the maximum.
+    The state is written to a JSON file so the schedule survives restarts.
+    """
+
+    def __init__(
+        self,
+        path=POLL_STATE_PATH,
+        min_interval=POLL_MIN_INTERVAL,
+        max_interval=POLL_MAX_INTERVAL,
+    ):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.state = {}
+        try:
+            with open(path, "r") as file:
+                self.state = json.load(file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading poll state, starting fresh: {e}")
+        self.loaded_schedule = self.schedule()
+
+    def _source(self, source):
+        return self.state.setdefault(
+            source,
+            {
+                "interval": self.min_interval,
+                "next_poll": 0,
+                "hash": None,
+                "history": [],
+                "listings": None,
+            },
+        )
+
+    def is_due(self, source, now=None):
+        """
+        Checks whether a source should be polled on this run.
+
+        Args:
+            source (str): The source URL.
+            now (float, optional): The current Unix time. Defaults to time.time().
+
+        Returns:
+            bool: True if the source's next poll time has passed, or if there are no listings
+                  from an earlier poll to fall back on.
+        """
+        now = time.time() if now is None else now
+        entry = self._source(source)
+        return now >= entry["next_poll"] or entry.get("listings") is None
+
+    def last_listings(self, source):
+        """
+        Returns the listings fetched by the last poll of a source, with only their links.
+
+        Args:
+            source (str): The source URL.
+
+        Returns:
+            dict: The listings as returned by `compact_listings`, or an empty dictionary if the
+                  source has never been polled.
+        """
+        return self._source(source).get("listings") or {}
+
+    def record_poll(self, source, listings, hits, now=None):
+        """
+        Records the outcome of a poll and schedules the next one.
+
+        Args:
+            source (str): The source URL.
+            listings (dict): The listings that were fetched.
+            hits (int): The number of new listings from the source that were saved.
+            now (float, optional): The current Unix time. Defaults to time.time().
+
+        Returns:
+            int: The interval in seconds until the source is next due.
+        """
+        now = time.time() if now is None else now
+        entry = self._source(source)
+        listings_hash = content_hash(listings)
+        changed = entry["hash"] is not None and listings_hash != entry["hash"]
+        entry["hash"] = listings_hash
+        entry["listings"] = compact_listings(listings)
+        entry["history"] = (entry["history"] + [[int(now), changed, hits]])[-HISTORY_LENGTH:]
+
+        quiet_streak = 0
+        for _, was_changed, was_hits in reversed(entry["history"]):
+            if was_changed or was_hits:
+                break
+            quiet_streak += 1
+
+        interval = self.min_interval * 2 ** quiet_streak
+        entry["interval"] = max(self.min_interval, min(self.max_interval, interval))
+        entry["next_poll"] = now + entry["interval"]
+        return entry["interval"]
+
+    def schedule(self):
+        """
+        Summarizes the parts of the state that decide future polls.
+
+        The poll history is left out. The next poll time is kept, because it only moves when
+        a source is polled, and a stale copy would make a fresh runner poll on every run.
+
+        Returns:
+            dict: The interval, next poll time and content hash of each source.
+        """
+        return {
+            source: [entry["interval"], entry["next_poll"], entry["hash"]]
+            for source, entry in self.state.items()
+        }
+
+    def schedule_changed(self):
+        """
+        Checks whether any source was polled, or its interval or content hash changed, since
+        the state file was loaded.
+
+        Returns:
+            bool: True if the schedule is worth persisting beyond the local state file.
+        """
+        return self.schedule() != self.loaded_schedule
+
+    def save(self):
+        """
+        Writes the schedule to the state file, replacing it atomically.
+
+        The file is written without indentation, since it is also stored in the repository
+        and the contents API only returns files up to 1 MB inline.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.state, file, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
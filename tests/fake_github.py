@@ -0,0 +1,180 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENTS_PATTERN = re.compile(r"/repos/([^/]+/[^/]+)/contents/(?:\./)?([^?]*)")
+BLOB_PATTERN = re.compile(r"/repos/([^/]+/[^/]+)/git/blobs/([0-9a-f]+)$")
+MAX_INLINE_SIZE = 1024 * 1024  # Larger files are returned by the contents API without content
+REPO_PATTERN = re.compile(r"/repos/([^/]+/[^/]+)$")
+
+
+def blob_sha(content):
+    """
+    Computes the SHA GitHub reports for a file's contents.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHubServer:
+    """
+    A local stand-in for the parts of the GitHub REST API that GitHubStore uses.
+
+    It serves repository lookups and the contents API for any repository name, keeps
+    files in memory, leaves files over `max_inline_size` out of contents responses (they
+    can be fetched as blobs), answers like GitHub does when a write carries a stale or missing
+    SHA (409 and 422), and reports a shrinking X-RateLimit-Remaining on every response.
+    Each request is logged as a (method, path) tuple in `requests`, and `failures` maps
+    (method, path suffix) to a status code to answer the next matching request with.
+
+    Args:
+        remaining (int, optional): The quota to start from. Defaults to 5000.
+        limit (int, optional): The quota reported as X-RateLimit-Limit. Defaults to 5000.
+    """
+
+    def __init__(self, remaining=5000, limit=5000):
+        self.files = {}  # {path: bytes}
+        self.requests = []
+        self.failures = {}  # {(method, path suffix): status}
+        self.remaining = remaining
+        self.limit = limit
+        self.max_inline_size = MAX_INLINE_SIZE
+        self.rate_headers = True  # Whether responses report the quota
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, method, path=None):
+        """
+        Counts the logged requests with the given method, and path if given.
+        """
+        return sum(
+            1
+            for logged_method, logged_path in self.requests
+            if logged_method == method and (path is None or logged_path.endswith(path))
+        )
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=None):
+                if not self.path.startswith("/rate_limit"):
+                    fake.remaining -= 1
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if fake.rate_headers:
+                    self.send_header("X-RateLimit-Limit", str(fake.limit))
+                    self.send_header("X-RateLimit-Remaining", str(fake.remaining))
+                    self.send_header("X-RateLimit-Reset", "4102444800")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _log(self, method):
+                fake.requests.append((method, self.path))
+                for key in list(fake.failures):
+                    if key[0] == method and self.path.endswith(key[1]):
+                        self._send(fake.failures.pop(key), {"message": "Server Error"})
+                        return True
+                return False
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _file(self, repo_name, path):
+                content = fake.files[path]
+                inline = len(content) <= fake.max_inline_size
+                return {
+                    "type": "file",
+                    "encoding": "base64" if inline else "none",
+                    "size": len(content),
+                    "name": path.rsplit("/", 1)[-1],
+                    "path": path,
+                    "sha": blob_sha(content),
+                    "content": base64.b64encode(content).decode() if inline else "",
+                    "url": f"{fake.url}/repos/{repo_name}/contents/{path}",
+                }
+
+            def do_GET(self):
+                if self._log("GET"):
+                    return
+                if self.path.startswith("/rate_limit"):
+                    core = {"limit": fake.limit, "remaining": fake.remaining, "reset": 4102444800}
+                    return self._send(200, {"resources": {"core": core}, "rate": core})
+                repo_match = REPO_PATTERN.match(self.path)
+                if repo_match:
+                    repo_name = repo_match.group(1)
+                    return self._send(
+                        200,
+                        {
+                            "name": repo_name.split("/")[1],
+                            "full_name": repo_name,
+                            "url": f"{fake.url}/repos/{repo_name}",
+                        },
+                    )
+                contents_match = CONTENTS_PATTERN.match(self.path)
+                if contents_match and contents_match.group(2) in fake.files:
+                    return self._send(200, self._file(*contents_match.groups()))
+                blob_match = BLOB_PATTERN.match(self.path)
+                if blob_match:
+                    for content in fake.files.values():
+                        if blob_sha(content) == blob_match.group(2):
+                            return self._send(
+                                200,
+                                {
+                                    "sha": blob_match.group(2),
+                                    "size": len(content),
+                                    "encoding": "base64",
+                                    "content": base64.encodebytes(content).decode(),
+                                },
+                            )
+                self._send(404, {"message": "Not Found"})
+
+            def do_PUT(self):
+                body = self._body()
+                if self._log("PUT"):
+                    return
+                contents_match = CONTENTS_PATTERN.match(self.path)
+                if not contents_match:
+                    return self._send(404, {"message": "Not Found"})
+                repo_name, path = contents_match.groups()
+                if path in fake.files:
+                    if "sha" not in body:
+                        return self._send(422, {"message": '"sha" wasn\'t supplied.'})
+                    if body["sha"] != blob_sha(fake.files[path]):
+                        return self._send(409, {"message": f"{path} does not match {body['sha']}"})
+                status = 200 if path in fake.files else 201
+                fake.files[path] = base64.b64decode(body["content"])
+                self._send(
+                    status,
+                    {"content": self._file(repo_name, path), "commit": {"sha": "0" * 40}},
+                )
+
+            def do_DELETE(self):
+                self._body()
+                if self._log("DELETE"):
+                    return
+                contents_match = CONTENTS_PATTERN.match(self.path)
+                if not contents_match or contents_match.group(2) not in fake.files:
+                    return self._send(404, {"message": "Not Found"})
+                del fake.files[contents_match.group(2)]
+                self._send(200, {"content": None, "commit": {"sha": "0" * 40}})
+
+        return Handler
@@ -0,0 +1,68 @@
+import asyncio
+import io
+import os
+import socket
+import sys
+import time
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+from aiohttp import web
+
+from async_webhook import AsyncWebhookClient
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AsyncWebhookClientTest(unittest.TestCase):
+    def test_retries_connection_errors(self):
+        async def send():
+            async with AsyncWebhookClient(max_attempts=2) as client:
+                await client.send_message(f"http://127.0.0.1:{closed_port()}/hook", [{}])
+
+        start = time.monotonic()
+        with redirect_stdout(io.StringIO()) as output:
+            with self.assertRaises(aiohttp.ClientConnectionError):
+                asyncio.run(send())
+
+        self.assertGreaterEqual(time.monotonic() - start, 1)  # Backed off once
+        self.assertEqual(output.getvalue().count("Retrying"), 1)
+
+    def test_retries_timeouts(self):
+        requests = []
+
+        async def hook(request):
+            requests.append(await request.json())
+            if len(requests) == 1:
+                await asyncio.sleep(2)
+            return web.Response(status=204)
+
+        async def send():
+            app = web.Application()
+            app.router.add_post("/hook", hook)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with AsyncWebhookClient(max_attempts=2, timeout=0.5) as client:
+                    await client.send_message(f"http://127.0.0.1:{port}/hook", [{"title": "A"}])
+            finally:
+                await runner.cleanup()
+
+        with redirect_stdout(io.StringIO()):
+            asyncio.run(send())
+
+        self.assertEqual(requests, [{"embeds": [{"title": "A"}]}] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github import Auth, Github, GithubException
+
+import old_bot
+from fake_github import FakeGitHubServer
+from github_store import GitHubStore
+
+REPO_NAME = "owner/repo"
+CSV_PATH = "listings.csv"
+HEADER = "company,job_title,link,date_posted\n"
+LISTING = ("Company A", "Software Engineer", "<http://example.com/apply>", "Jul 29")
+
+
+class GitHubStoreTest(unittest.TestCase):
+    def connect(self, server, reserve=500):
+        github = Github(
+            auth=Auth.Token("token"),
+            base_url=server.url,
+            retry=None,
+            seconds_between_requests=0,
+            seconds_between_writes=0,
+        )
+        return GitHubStore(github, REPO_NAME, reserve=reserve)
+
+    def run_bot(self, server, reserve):
+        old_bot.store = self.connect(server, reserve)
+        with redirect_stdout(io.StringIO()):
+            old_bot.read_csv()
+            old_bot.append_to_csv([LISTING])
+            old_bot.store.write("poll_state.json", "{}", "Update poll state", critical=False)
+            old_bot.store.flush()
+        return old_bot.store
+
+    def test_reads_each_path_once(self):
+        with FakeGitHubServer() as server:
+            server.files[CSV_PATH] = HEADER.encode()
+            store = self.run_bot(server, reserve=500)
+
+        self.assertEqual(server.count("GET", CSV_PATH), 1)
+        self.assertEqual(server.count("GET", "poll_state.json"), 1)
+        self.assertEqual(server.count("PUT"), 2)
+        self.assertEqual(server.files[CSV_PATH].decode(), HEADER + ",".join(LISTING) + "\n")
+        self.assertEqual(server.files["poll_state.json"], b"{}")
+        self.assertEqual(store.requests, len(server.requests))
+        self.assertEqual(store.skipped, [])
+
+    def test_skips_deferred_write_below_reserve(self):
+        with FakeGitHubServer(remaining=100) as server:
+            server.files[CSV_PATH] = HEADER.encode()
+            store = self.run_bot(server, reserve=500)
+
+        self.assertEqual(server.count("GET", CSV_PATH), 1)
+        self.assertEqual(server.count("PUT", CSV_PATH), 1)
+        self.assertEqual(server.count("GET", "poll_state.json"), 0)
+        self.assertEqual(server.count("PUT", "poll_state.json"), 0)
+        self.assertEqual(store.skipped, ["poll_state.json"])
+        self.assertIn("Skipped Writes: poll_state.json", store.quota_summary())
+        self.assertEqual(store.requests, len(server.requests))
+
+    def test_read_error_keeps_csv(self):
+        with FakeGitHubServer() as server:
+            server.files[CSV_PATH] = (HEADER + ",".join(LISTING) + "\n").encode()
+            server.failures[("GET", CSV_PATH)] = 502
+            old_bot.store = self.connect(server)
+            with redirect_stdout(io.StringIO()):
+                with self.assertRaises(GithubException):
+                    old_bot.read_csv()
+
+        self.assertEqual(server.count("PUT"), 0)
+        self.assertEqual(server.files[CSV_PATH].decode(), HEADER + ",".join(LISTING) + "\n")
+
+    def test_creates_missing_csv_without_overwriting(self):
+        with FakeGitHubServer() as server:
+            old_bot.store = self.connect(server)
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(old_bot.read_csv(), set())
+            self.assertEqual(server.files[CSV_PATH].decode(), HEADER)
+
+            store = self.connect(server)
+            self.assertIsNone(store.read("other.csv"))
+            server.files["other.csv"] = b"kept"  # Created by another run
+            with self.assertRaises(GithubException) as raised:
+                store.write("other.csv", HEADER, "Create", create_only=True)
+
+        self.assertEqual(raised.exception.status, 422)
+        self.assertEqual(server.files["other.csv"], b"kept")
+
+    def test_reads_large_file_as_blob(self):
+        with FakeGitHubServer() as server:
+            server.max_inline_size = 10
+            server.files["poll_state.json"] = b'{"source": {"interval": 300}}'
+            store = self.connect(server)
+            content = store.read("poll_state.json")
+
+        self.assertEqual(content, '{"source": {"interval": 300}}')
+        self.assertEqual(server.count("GET", "poll_state.json"), 1)
+        self.assertEqual(store.requests, 3)
+
+    def test_counts_get_repo_request(self):
+        with FakeGitHubServer() as server:
+            store = self.connect(server)
+
+        self.assertEqual(server.requests, [("GET", f"/repos/{REPO_NAME}")])
+        self.assertEqual(store.requests, 1)
+        self.assertEqual(store.remaining, server.remaining)
+        self.assertIn("GitHub Requests: 1 |", store.quota_summary())
+
+    def test_tracks_quota_only_from_responses(self):
+        with FakeGitHubServer() as server:
+            server.rate_headers = False
+            store = self.connect(server)
+            store.read(CSV_PATH)
+            self.assertIsNone(store.remaining)
+            self.assertFalse(store.budget_low())
+
+            server.failures[("GET", f"/repos/{REPO_NAME}")] = 502
+            with self.assertRaises(GithubException) as raised:
+                self.connect(server)
+
+        self.assertEqual(raised.exception.status, 502)
+        self.assertEqual(store.requests, 2)
+        self.assertEqual(server.count("GET", "/rate_limit"), 0)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_retries_write_when_stale(self):
+        with FakeGitHubServer() as server:
+            store = self.connect(server)
+            self.assertIsNone(store.read(CSV_PATH))
+            server.files[CSV_PATH] = HEADER.encode()  # Created by another run (422)
+            store.write(CSV_PATH, "created", "Create")
+            server.files[CSV_PATH] = b"changed"  # Changed by another run (409)
+            store.write(CSV_PATH, "updated", "Update")
+
+        self.assertEqual(server.files[CSV_PATH], b"updated")
+        self.assertEqual(server.count("PUT", CSV_PATH), 4)
+        self.assertEqual(server.count("GET", CSV_PATH), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
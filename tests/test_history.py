@@ -0,0 +1,186 @@
+import csv
+import io
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest import mock
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history
+
+HEADER = ["company", "job_title", "link", "date_posted"]
+COMPANIES = ["Acme Robotics", "Globex", "Initech Systems", "Umbrella Labs", "Stark Industries"]
+TITLES = ["Software Engineer Intern", "Data Science Intern", "Hardware Engineer", "Product Manager"]
+HOSTS = [
+    "boards.greenhouse.io",
+    "job-boards.greenhouse.io",
+    "greenhouse.io",
+    "jobs.lever.co",
+    "acme.wd1.myworkdayjobs.com",
+    "myworkdayjobs.com",
+    "www.example.com",
+    "example-jobs.com",
+]
+MONTHS = ["Jan", "Mar", "May", "Jul", "Aug", "Oct", "Dec"]
+# Runs that indexed the listings, or None for rows backfilled from the CSV
+INGESTED_ON = [None, datetime(2023, 12, 31), datetime(2024, 1, 15), datetime(2024, 9, 1)]
+# Query plans, identified by the SQL each one runs
+PLANS = {
+    "filters only": re.compile(
+        r"^SELECT id, company, job_title, link, date_posted FROM listings\b(?!.*listings_fts)"
+    ),
+    "rare term": re.compile(r"AND id IN \(SELECT rowid FROM listings_fts"),
+    "selective filters": re.compile(r"AND rowid IN \("),
+    "full-text scan": re.compile(r"FROM listings_fts JOIN listings"),
+}
+
+
+def listing(i):
+    return (f"Company {i}", f"Software Engineer Intern {i}", f"https://example.com/{i}", "Aug 01")
+
+
+class BuildIndexTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.csv_path = os.path.join(directory, "listings.csv")
+        self.conn = history.connect(os.path.join(directory, "listings.db"))
+        self.addCleanup(self.conn.close)
+
+    def write_csv(self, rows):
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+
+    def indexed(self):
+        return set(self.conn.execute("SELECT company, job_title, link, date_posted FROM listings"))
+
+    def build(self):
+        with redirect_stdout(io.StringIO()):
+            return history.build_index(self.conn, self.csv_path)
+
+    def test_indexes_appended_rows(self):
+        self.write_csv([listing(i) for i in range(3)])
+        self.assertEqual(self.build(), 3)
+        self.write_csv([listing(i) for i in range(5)])
+        self.assertEqual(self.build(), 2)
+        self.assertEqual(self.build(), 0)
+        self.assertEqual(self.indexed(), {listing(i) for i in range(5)})
+
+    def test_rebuilds_when_csv_regrows_after_clear(self):
+        self.write_csv([listing(i) for i in range(3)])
+        self.build()
+        # clear_csv.py ran, and the CSV grew past its old length before the next build
+        self.write_csv([listing(i) for i in range(10, 15)])
+        self.assertEqual(self.build(), 5)
+        self.assertEqual(self.indexed(), {listing(i) for i in range(10, 15)})
+
+
+def tokens(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def contains_phrase(text, phrase):
+    text, phrase = tokens(text), tokens(phrase)
+    return any(text[i:i + len(phrase)] == phrase for i in range(len(text) - len(phrase) + 1))
+
+
+def brute_force(rows, search=None, company=None, host=None, since=None, until=None,
+                year=None, after=None, limit=25):
+    """
+    Answers a query by checking every row, as the reference for `query_listings`.
+    """
+    results = []
+    for id, row_company, job_title, link, date_posted, posted_year in sorted(rows, reverse=True):
+        posted_on = history.normalize_date(date_posted)
+        link_host = urlparse(link).hostname.removeprefix("www.")
+        if search and not all(
+            term in tokens(row_company) + tokens(job_title) for term in tokens(search)
+        ):
+            continue
+        if company and not contains_phrase(row_company, company):
+            continue
+        if host and link_host != host and not link_host.endswith("." + host):
+            continue
+        if since and (posted_on is None or posted_on < history.normalize_date(since)):
+            continue
+        if until and (posted_on is None or posted_on > history.normalize_date(until)):
+            continue
+        if year is not None and posted_year != year:
+            continue
+        if after is not None and id >= after:
+            continue
+        results.append((id, row_company, job_title, link, date_posted))
+    return results[:limit]
+
+
+class QueryListingsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.conn = history.connect(os.path.join(directory, "listings.db"))
+        self.addCleanup(self.conn.close)
+
+        rng = random.Random(0)
+        for batch, ingested_on in enumerate(INGESTED_ON * 3):
+            listings = []
+            for i in range(batch * 50, batch * 50 + 50):
+                if i % 23 == 0:
+                    date_posted = "N/A"
+                else:
+                    date_posted = f"{rng.choice(MONTHS)} {rng.randint(1, 28):02d}"
+                listings.append((
+                    rng.choice(COMPANIES),
+                    f"{rng.choice(TITLES)} {i}",
+                    f"https://{rng.choice(HOSTS)}/jobs/{i}",
+                    date_posted,
+                ))
+            history.index_listings(self.conn, listings, ingested_on=ingested_on)
+        self.conn.execute("ANALYZE")
+        self.rows = self.conn.execute(
+            "SELECT id, company, job_title, link, date_posted, posted_year FROM listings"
+        ).fetchall()
+
+    def test_matches_brute_force(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        rng = random.Random(1)
+        # A high cap makes every filter selective and every term rare; a low one neither
+        for cap in (1, 20, 60, 10 ** 6):
+            with mock.patch.object(history, "PLAN_PROBE_ROWS", cap):
+                for _ in range(150):
+                    query = {
+                        "search": rng.choice(
+                            [None, None, "engineer", "intern", "robotics", "data intern"]
+                        ),
+                        "company": rng.choice([None, None, "Acme", "initech systems", "Globex"]),
+                        "host": rng.choice([None, "greenhouse.io", "myworkdayjobs.com",
+                                            "wd1.myworkdayjobs.com", "example.com", "lever.co"]),
+                        "since": rng.choice([None, "Mar 01", "Jul 15"]),
+                        "until": rng.choice([None, "Aug 31", "Dec 31"]),
+                        "year": rng.choice([None, None, 2023, 2024]),
+                        "after": rng.choice([None, rng.randint(1, len(self.rows))]),
+                        "limit": rng.choice([5, 25, 1000]),
+                    }
+                    with self.subTest(cap=cap, **query):
+                        self.assertEqual(
+                            history.query_listings(self.conn, **query),
+                            brute_force(self.rows, **query),
+                        )
+
+        for plan, pattern in PLANS.items():
+            with self.subTest(plan=plan):
+                self.assertTrue(any(pattern.search(sql) for sql in statements))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import old_bot
+from readme_parser import parse_readme
+from scheduler import PollScheduler
+
+SOURCE = "https://example.com/README.md"
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def test_backoff_survives_fresh_runners(self):
+        # Hourly runs, each on a fresh runner that restores the copy saved to the repository
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        repo_copy = os.path.join(directory, "repo.json")
+        polled = []
+        for run in range(40):
+            now = run * 3600
+            path = os.path.join(directory, f"run{run}.json")
+            if os.path.exists(repo_copy):
+                shutil.copy(repo_copy, path)
+            scheduler = PollScheduler(path, min_interval=300, max_interval=6 * 3600)
+            if scheduler.is_due(SOURCE, now):
+                polled.append(run)
+                scheduler.record_poll(SOURCE, {"Company": {}}, 0, now)
+            scheduler.save()
+            if scheduler.schedule_changed():
+                shutil.copy(path, repo_copy)
+
+        self.assertEqual(polled, [0, 1, 2, 3, 5, 8, 14, 20, 26, 32, 38])
+
+    def test_unchanged_when_nothing_polled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "poll_state.json")
+        scheduler = PollScheduler(path, min_interval=300, max_interval=3600)
+        scheduler.record_poll(SOURCE, {"Company": {}}, 1, now=0)
+        scheduler.save()
+
+        scheduler = PollScheduler(path, min_interval=300, max_interval=3600)
+        self.assertFalse(scheduler.is_due(SOURCE, now=100))
+        self.assertFalse(scheduler.schedule_changed())
+
+    def test_skipped_secondary_still_filters_primary(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        row = (
+            '| **[Company A](https://example.com/a)** | Software Engineer Intern | Remote | '
+            '<a href="https://example.com/apply?utm_source=Simplify"><img src="https://i.imgur.com/u1KNU8z.png" '
+            'width="118" alt="Apply"></a> | Sep 01 |'
+        )
+        listings = parse_readme(row)
+        scheduler = PollScheduler(os.path.join(directory, "poll_state.json"))
+        scheduler.record_poll(SOURCE, listings, 1, now=0)
+        scheduler.save()
+
+        known_secondary = PollScheduler(scheduler.path).last_listings(SOURCE)
+        self.assertEqual(
+            known_secondary,
+            {"Company A": {"Software Engineer Intern": {"link": "<https://example.com/apply?utm_source=Simplify>"}}},
+        )
+        with redirect_stdout(io.StringIO()):
+            new_listings, saved = old_bot.remove_duplicates(set(), listings, {}, known_secondary)
+        self.assertEqual(new_listings, [])
+        self.assertEqual(saved, {"primary": 0, "secondary": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()